@@ -0,0 +1,346 @@
+const STORAGE_KEY = 'metacreative_tags';
+const TAG_USAGE_KEY = 'metacreative_tag_usage';
+let isDescending = true;
+let currentTag = '';
+let tagsData = {};
+let tagUsage = {};
+
+// localStorageからタグデータを読み込み
+function loadTagsFromStorage() {
+    const stored = localStorage.getItem(STORAGE_KEY);
+    if (stored) {
+        try {
+            tagsData = JSON.parse(stored);
+        } catch (e) {
+            tagsData = {};
+        }
+    }
+    // タグ使用履歴を読み込み
+    const usageStored = localStorage.getItem(TAG_USAGE_KEY);
+    if (usageStored) {
+        try {
+            tagUsage = JSON.parse(usageStored);
+        } catch (e) {
+            tagUsage = {};
+        }
+    }
+}
+
+// localStorageにタグデータを保存
+function saveTagsToStorage() {
+    localStorage.setItem(STORAGE_KEY, JSON.stringify(tagsData));
+}
+
+// タグ使用履歴を保存
+function saveTagUsage() {
+    localStorage.setItem(TAG_USAGE_KEY, JSON.stringify(tagUsage));
+}
+
+// タグの使用を記録
+function recordTagUsage(tag) {
+    tagUsage[tag] = Date.now();
+    saveTagUsage();
+}
+
+// 全タグのリストを取得（最近使った順）
+function getAllTags() {
+    const allTags = new Set();
+    Object.values(tagsData).forEach(tags => {
+        tags.forEach(tag => allTags.add(tag));
+    });
+    // 最近使った順にソート（使用履歴がないものは最後）
+    return Array.from(allTags).sort((a, b) => {
+        const usageA = tagUsage[a] || 0;
+        const usageB = tagUsage[b] || 0;
+        return usageB - usageA;
+    });
+}
+
+// タグフィルターボタンを再生成
+function renderFilterButtons() {
+    const container = document.getElementById('tag-filter-buttons');
+    const allTags = getAllTags();
+
+    container.innerHTML = '<button class="tag-btn active" data-tag="">すべて</button>';
+    allTags.forEach(tag => {
+        const btn = document.createElement('button');
+        btn.className = 'tag-btn';
+        btn.dataset.tag = tag;
+        btn.textContent = tag;
+        container.appendChild(btn);
+    });
+
+    // イベント再設定
+    container.querySelectorAll('.tag-btn').forEach(btn => {
+        btn.addEventListener('click', function() {
+            filterByTag(this.dataset.tag);
+            container.querySelectorAll('.tag-btn').forEach(b => b.classList.remove('active'));
+            this.classList.add('active');
+        });
+    });
+}
+
+// ドキュメントのタグ表示を更新
+function renderDocTags() {
+    document.querySelectorAll('.doc-item').forEach(item => {
+        const filename = item.dataset.filename;
+        const tags = tagsData[filename] || [];
+        const tagsContainer = item.querySelector('.doc-tags');
+
+        // data-tags属性も更新
+        item.dataset.tags = tags.join(' ');
+
+        // タグHTML生成
+        let html = '<button class="add-tag-btn" onclick="showTagInput(event, \''+filename+'\')">+</button>';
+        tags.forEach(tag => {
+            html += `<span class="tag-with-delete" onclick="event.preventDefault(); event.stopPropagation();">
+                ${tag}
+                <button class="tag-delete-btn" onclick="removeTag(event, '${filename}', '${tag}')">&times;</button>
+            </span>`;
+        });
+        tagsContainer.innerHTML = html;
+    });
+}
+
+// タグ入力を表示
+function showTagInput(event, filename) {
+    event.preventDefault();
+    event.stopPropagation();
+
+    // 既存の入力があれば削除
+    const existing = document.querySelector('.tag-input-container');
+    if (existing) existing.remove();
+
+    const btn = event.currentTarget;
+    const container = document.createElement('div');
+    container.className = 'tag-input-container';
+
+    const input = document.createElement('input');
+    input.type = 'text';
+    input.className = 'tag-input';
+    input.placeholder = 'タグを入力...';
+
+    const suggestions = document.createElement('div');
+    suggestions.className = 'tag-suggestions';
+    suggestions.style.display = 'none';
+
+    container.appendChild(input);
+    container.appendChild(suggestions);
+    btn.parentNode.insertBefore(container, btn.nextSibling);
+    input.focus();
+
+    // 入力時のサジェスト
+    input.addEventListener('input', function() {
+        const val = this.value.trim().toLowerCase();
+        const allTags = getAllTags();
+        const currentTags = tagsData[filename] || [];
+
+        // 既についているタグは除外
+        const availableTags = allTags.filter(t => !currentTags.includes(t));
+
+        if (val) {
+            const matches = availableTags.filter(t => t.toLowerCase().includes(val));
+            let html = '';
+            matches.forEach(t => {
+                html += `<div class="tag-suggestion-item" data-tag="${t}">${t}</div>`;
+            });
+            // 新規タグとして追加オプション
+            if (!allTags.map(t => t.toLowerCase()).includes(val)) {
+                html += `<div class="tag-suggestion-item new-tag" data-tag="${this.value.trim()}">「${this.value.trim()}」を新規作成</div>`;
+            }
+            suggestions.innerHTML = html;
+            suggestions.style.display = html ? 'block' : 'none';
+
+            // クリックイベント
+            suggestions.querySelectorAll('.tag-suggestion-item').forEach(item => {
+                item.addEventListener('click', function(e) {
+                    e.preventDefault();
+                    e.stopPropagation();
+                    addTag(filename, this.dataset.tag);
+                    container.remove();
+                });
+            });
+        } else {
+            // 空の場合は既存タグ一覧を表示
+            let html = '';
+            availableTags.slice(0, 5).forEach(t => {
+                html += `<div class="tag-suggestion-item" data-tag="${t}">${t}</div>`;
+            });
+            suggestions.innerHTML = html;
+            suggestions.style.display = html ? 'block' : 'none';
+
+            suggestions.querySelectorAll('.tag-suggestion-item').forEach(item => {
+                item.addEventListener('click', function(e) {
+                    e.preventDefault();
+                    e.stopPropagation();
+                    addTag(filename, this.dataset.tag);
+                    container.remove();
+                });
+            });
+        }
+    });
+
+    // Enterキーで追加
+    input.addEventListener('keydown', function(e) {
+        if (e.key === 'Enter' && this.value.trim()) {
+            addTag(filename, this.value.trim());
+            container.remove();
+        } else if (e.key === 'Escape') {
+            container.remove();
+        }
+    });
+
+    // フォーカス外れたら閉じる（少し遅延させてクリックを受け付ける）
+    input.addEventListener('blur', function() {
+        setTimeout(() => {
+            if (!container.contains(document.activeElement)) {
+                container.remove();
+            }
+        }, 200);
+    });
+
+    // 初期表示
+    input.dispatchEvent(new Event('input'));
+}
+
+// タグを追加
+function addTag(filename, tag) {
+    if (!tagsData[filename]) {
+        tagsData[filename] = [];
+    }
+    if (!tagsData[filename].includes(tag)) {
+        tagsData[filename].push(tag);
+        recordTagUsage(tag);
+        saveTagsToStorage();
+        renderDocTags();
+        renderFilterButtons();
+        showToast('タグを追加しました');
+    }
+}
+
+// タグを削除
+function removeTag(event, filename, tag) {
+    event.preventDefault();
+    event.stopPropagation();
+
+    if (tagsData[filename]) {
+        tagsData[filename] = tagsData[filename].filter(t => t !== tag);
+        if (tagsData[filename].length === 0) {
+            delete tagsData[filename];
+        }
+        saveTagsToStorage();
+        renderDocTags();
+        renderFilterButtons();
+        // フィルターをリセット
+        if (currentTag === tag) {
+            filterByTag('');
+        }
+        showToast('タグを削除しました');
+    }
+}
+
+// タグデータをエクスポート
+function exportTags() {
+    const json = JSON.stringify(tagsData, null, 2);
+    const blob = new Blob([json], { type: 'application/json' });
+    const url = URL.createObjectURL(blob);
+    const a = document.createElement('a');
+    a.href = url;
+    a.download = 'tags.json';
+    document.body.appendChild(a);
+    a.click();
+    document.body.removeChild(a);
+    URL.revokeObjectURL(url);
+    showToast('tags.jsonをダウンロードしました');
+}
+
+// タグデータをインポート
+function importTags(event) {
+    const file = event.target.files[0];
+    if (!file) return;
+
+    const reader = new FileReader();
+    reader.onload = function(e) {
+        try {
+            const imported = JSON.parse(e.target.result);
+            if (typeof imported === 'object' && imported !== null) {
+                tagsData = imported;
+                saveTagsToStorage();
+                renderDocTags();
+                renderFilterButtons();
+                showToast('タグをインポートしました');
+            } else {
+                showToast('無効なファイル形式です');
+            }
+        } catch (err) {
+            showToast('JSONの読み込みに失敗しました');
+            console.error(err);
+        }
+    };
+    reader.readAsText(file);
+    event.target.value = '';
+}
+
+function copyLink(event, url) {
+    event.preventDefault();
+    event.stopPropagation();
+
+    navigator.clipboard.writeText(url).then(function() {
+        showToast('リンクをコピーしました');
+    }).catch(function(err) {
+        console.error('コピーに失敗しました:', err);
+    });
+}
+
+function showToast(message) {
+    const toast = document.getElementById('toast');
+    toast.textContent = message;
+    toast.classList.add('show');
+    setTimeout(function() {
+        toast.classList.remove('show');
+    }, 2000);
+}
+
+function toggleSort() {
+    isDescending = !isDescending;
+    const list = document.getElementById('doc-list');
+    const items = Array.from(list.querySelectorAll('.doc-item'));
+    const btn = document.getElementById('sort-toggle');
+    const label = btn.querySelector('.sort-label');
+    const svg = btn.querySelector('svg');
+
+    items.sort((a, b) => {
+        const keyA = a.dataset.sortKey;
+        const keyB = b.dataset.sortKey;
+        return isDescending ? keyB.localeCompare(keyA) : keyA.localeCompare(keyB);
+    });
+
+    items.forEach(item => list.appendChild(item));
+    label.textContent = isDescending ? '新しい順' : '古い順';
+    svg.style.transform = isDescending ? 'rotate(0deg)' : 'rotate(180deg)';
+}
+
+function filterByTag(tag) {
+    currentTag = tag;
+    const items = document.querySelectorAll('.doc-item');
+    let visibleCount = 0;
+
+    items.forEach(item => {
+        const tags = item.dataset.tags || '';
+        if (!tag || tags.split(' ').includes(tag)) {
+            item.style.display = '';
+            visibleCount++;
+        } else {
+            item.style.display = 'none';
+        }
+    });
+
+    document.getElementById('doc-count').textContent = `(${visibleCount}件)`;
+}
+
+// 初期化
+document.addEventListener('DOMContentLoaded', function() {
+    loadTagsFromStorage();
+    renderDocTags();
+    renderFilterButtons();
+});
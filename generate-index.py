@@ -7,119 +7,179 @@ docs/フォルダ内のHTMLファイルを検索し、index.htmlを生成しま
 
 import os
 import re
+import argparse
 import json
-import unicodedata
+import itertools
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from html import escape, unescape
+from operator import attrgetter
 from pathlib import Path
 
+# orjsonがあれば使う（なければ標準のjsonで読む）
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 DOCS_DIR = "docs"
 OUTPUT_FILE = "index.html"
 BASE_URL = "https://tamkai.github.io/MetaCreativeDocs/"
 IGNORE_FILE = ".docsignore"
 TAGS_FILE = "tags.json"
+TITLE_CACHE_FILE = ".titles.json"
+
+# titleとh1を探す正規表現（起動時に一度だけコンパイルしておく）
+_TITLE_H1_RE = re.compile(rb'<(title|h1)(?:\s[^>]*)?>(.*?)</\1\s*>', re.IGNORECASE | re.DOTALL)
+
+# リネーム時の連番（同じ秒に複数リネームしても名前が重複しない）
+_rename_counter = itertools.count()
 
-def sanitize_filename(filename):
+# index.htmlに載せる1ドキュメント分の情報
+DocEntry = namedtuple('DocEntry', 'path filename title date_str sort_key tags_attr full_url sort_key_str')
+
+def sanitize_filename(filename, timestamp=None):
     """日本語や特殊文字を含むファイル名をASCII安全な名前に変換"""
-    stem = Path(filename).stem
-    ext = Path(filename).suffix
+    stem, ext = os.path.splitext(filename)
 
     # ASCII文字のみかチェック
-    try:
-        stem.encode('ascii')
+    if stem.isascii():
         return None  # リネーム不要
-    except UnicodeEncodeError:
-        pass
 
     # 日本語をローマ字風のハッシュに変換
     # シンプルにタイムスタンプベースの名前を生成
-    timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
-    safe_name = f"doc-{timestamp}{ext}"
+    if timestamp is None:
+        timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    safe_name = f"doc-{timestamp}-{next(_rename_counter):04d}{ext}"
     return safe_name
 
-def rename_japanese_files(docs_path):
-    """日本語ファイル名をリネーム"""
-    renamed = []
-    for html_file in list(docs_path.glob("*.html")):
-        new_name = sanitize_filename(html_file.name)
-        if new_name:
-            new_path = html_file.parent / new_name
-            # 重複回避
-            counter = 1
-            while new_path.exists():
-                stem = Path(new_name).stem
-                ext = Path(new_name).suffix
-                new_path = html_file.parent / f"{stem}-{counter}{ext}"
-                counter += 1
-
-            html_file.rename(new_path)
-            renamed.append((html_file.name, new_path.name))
-            print(f"Renamed: {html_file.name} -> {new_path.name}")
-    return renamed
+def rename_japanese_file(filename, timestamp, existing):
+    """日本語ファイル名をリネームし、新しいファイル名を返す（不要ならNone）"""
+    new_name = sanitize_filename(filename, timestamp)
+    if not new_name:
+        return None
+    # 連番は実行ごとに0から始まるので、同じ秒に前回の実行で付けた名前と重ならないよう、
+    # ファイル一覧のスナップショット（existing）で確認する（statは不要）
+    while new_name in existing:
+        new_name = sanitize_filename(filename, timestamp)
+    existing.add(new_name)
+    os.rename(os.path.join(DOCS_DIR, filename), os.path.join(DOCS_DIR, new_name))
+    print(f"Renamed: {filename} -> {new_name}")
+    return new_name
+
+def strip_tags(text):
+    """文字列からHTMLタグを除去（< と > の組を順に読み飛ばす）"""
+    parts = []
+    pos = 0
+    while True:
+        start = text.find('<', pos)
+        if start == -1:
+            break
+        end = text.find('>', start)
+        if end == -1:
+            break
+        parts.append(text[pos:start])
+        pos = end + 1
+    parts.append(text[pos:])
+    return ''.join(parts)
+
+def find_title(buf):
+    """<title>の中身を返す（なければ最初の<h1>、どちらもなければNone）"""
+    h1 = None
+    # titleとh1を1回の走査でまとめて探す
+    for match in _TITLE_H1_RE.finditer(buf):
+        text = match.group(2).decode('utf-8', errors='replace')
+        if match.group(1).lower() == b'title':
+            # 文字参照は出力時にエスケープし直すので、ここで元に戻しておく
+            title = unescape(text).strip()
+            if title:
+                return title
+        elif h1 is None:
+            # HTMLタグを除去
+            h1 = unescape(strip_tags(text)).strip() or None
+    return h1
+
+def get_file_stem(filepath):
+    """パスから拡張子を除いたファイル名を取得"""
+    return os.path.splitext(os.path.basename(filepath))[0]
 
 def get_html_title(filepath):
-    """HTMLファイルからtitleタグの内容を取得"""
+    """HTMLファイルからtitleタグの内容を取得（titleがなければh1）"""
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-            # titleタグから取得
-            match = re.search(r'<title>(.*?)</title>', content, re.IGNORECASE | re.DOTALL)
-            if match:
-                title = match.group(1).strip()
-                if title:
-                    return title
-            # h1タグから取得（titleがない場合）
-            match = re.search(r'<h1[^>]*>(.*?)</h1>', content, re.IGNORECASE | re.DOTALL)
-            if match:
-                # HTMLタグを除去
-                title = re.sub(r'<[^>]+>', '', match.group(1)).strip()
-                if title:
-                    return title
+        with open(filepath, 'rb') as f:
+            # 先にf.read()で読み込んでから検索する
+            # （read中はGILが外れるので、スレッドプールで複数ファイルの読み込みが重なる。
+            #   mmap上で直接検索するとディスク読み込みが正規表現の中（GIL保持中）で起きる）
+            title = find_title(f.read())
+            if title:
+                return title
     except:
         pass
-    return Path(filepath).stem
-
-def get_file_date(filepath):
-    """ファイルの更新日時を取得"""
-    return datetime.fromtimestamp(os.path.getmtime(filepath))
+    return get_file_stem(filepath)
 
-def get_date_from_filename(filename):
-    """ファイル名から日付を抽出（YYYYMMDD形式）"""
-    match = re.match(r'^(\d{8})', filename)
-    if match:
-        try:
-            return datetime.strptime(match.group(1), '%Y%m%d')
-        except ValueError:
-            pass
-    return None
-
-def get_sort_key_from_filename(filename):
-    """ファイル名からソートキーを抽出（YYYYMMDD_NN形式）"""
-    # 例: 20251128_02_xxx.html -> (20251128, 2)
-    match = re.match(r'^(\d{8})(?:_(\d+))?', filename)
-    if match:
-        date_str = match.group(1)
-        num = int(match.group(2)) if match.group(2) else 0
-        return (date_str, num)
-    return ('00000000', 0)
+def get_mtime_ns(path):
+    """ファイルの更新日時（ナノ秒）を取得（存在しなければ0）"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+def get_file_date(st):
+    """ファイルの更新日をYYYY-MM-DD形式で取得（取得済みのstat結果を使う）"""
+    d = datetime.fromtimestamp(st.st_mtime)
+    return f"{d.year:04d}-{d.month:02d}-{d.day:02d}"
+
+def parse_filename(filename):
+    """ファイル名から表示用の日付とソートキーをまとめて抽出（YYYYMMDD_NN形式）"""
+    # 例: 20251128_02_xxx.html -> ('2025-11-28', ('20251128', 2))
+    # 形式が固定なので正規表現を使わず文字列の切り出しで判定する
+    date_str = filename[:8]
+    if len(date_str) != 8 or not (date_str.isascii() and date_str.isdigit()):
+        return None, ('00000000', 0)
+    num = 0
+    if filename[8:9] == '_':
+        rest = filename[9:]
+        digits = len(rest) - len(rest.lstrip('0123456789'))
+        if digits:
+            num = int(rest[:digits])
+    # 2月30日のような存在しない日付は表示に使わない（妥当性チェックのみ）
+    try:
+        datetime(int(date_str[:4]), int(date_str[4:6]), int(date_str[6:8]))
+    except ValueError:
+        return None, (date_str, num)
+    return f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:8]}", (date_str, num)
 
 def load_ignore_list():
     """除外リストを読み込む"""
-    ignore_list = set()
     if Path(IGNORE_FILE).exists():
-        with open(IGNORE_FILE, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#'):
-                    ignore_list.add(line)
-    return ignore_list
+        data = Path(IGNORE_FILE).read_text(encoding='utf-8')
+        # 読み取り専用で使うのでfrozensetにしておく
+        return frozenset(line for line in map(str.strip, data.splitlines())
+                         if line and not line.startswith('#'))
+    return frozenset()
 
 def load_tags():
     """タグ情報を読み込む"""
     if Path(TAGS_FILE).exists():
-        with open(TAGS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return _json_loads(Path(TAGS_FILE).read_bytes())
+    return {}
+
+def load_title_cache():
+    """タイトルキャッシュ（ファイル名 -> [mtime_ns, size, title]）を読み込む"""
+    if Path(TITLE_CACHE_FILE).exists():
+        try:
+            return _json_loads(Path(TITLE_CACHE_FILE).read_bytes())
+        except (OSError, ValueError):
+            pass
     return {}
 
+def save_title_cache(cache):
+    """タイトルキャッシュを書き出す"""
+    with open(TITLE_CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2)
+
 def get_all_tags(tags_data):
     """全タグのリストを取得"""
     all_tags = set()
@@ -127,83 +187,8 @@ def get_all_tags(tags_data):
         all_tags.update(tags)
     return sorted(all_tags)
 
-def generate_index():
-    """index.htmlを生成"""
-    docs_path = Path(DOCS_DIR)
-
-    # 除外リストを読み込む
-    ignore_list = load_ignore_list()
-
-    # タグ情報を読み込む
-    tags_data = load_tags()
-    all_tags = get_all_tags(tags_data)
-
-    # 日本語ファイル名をリネーム
-    if docs_path.exists():
-        rename_japanese_files(docs_path)
-
-    # HTMLファイルを収集
-    html_files = []
-    if docs_path.exists():
-        for html_file in docs_path.glob("*.html"):
-            # 除外リストに含まれるファイルはスキップ
-            if html_file.name in ignore_list:
-                print(f"Skipped (in ignore list): {html_file.name}")
-                continue
-            title = get_html_title(html_file)
-            # ファイル名から日付を取得、なければ更新日時を使用
-            filename_date = get_date_from_filename(html_file.name)
-            date = filename_date if filename_date else get_file_date(html_file)
-            sort_key = get_sort_key_from_filename(html_file.name)
-            # タグを取得
-            doc_tags = tags_data.get(html_file.name, [])
-            html_files.append({
-                'path': str(html_file),
-                'filename': html_file.name,
-                'title': title,
-                'date': date,
-                'sort_key': sort_key,
-                'tags': doc_tags
-            })
-
-    # 日付の新しい順、同日は番号順にソート
-    html_files.sort(key=lambda x: (x['sort_key'][0], x['sort_key'][1]), reverse=True)
-
-    # ドキュメントリストのHTML生成
-    if html_files:
-        docs_html = ""
-        for doc in html_files:
-            date_str = doc['date'].strftime('%Y-%m-%d')
-            full_url = BASE_URL + doc['path']
-            sort_key = f"{doc['sort_key'][0]}_{doc['sort_key'][1]:02d}"
-            docs_html += f'''        <li class="doc-item" data-sort-key="{sort_key}" data-filename="{doc['filename']}" data-tags="">
-            <a href="{doc['path']}" class="doc-link">
-                <div class="doc-info">
-                    <span class="doc-title">{doc['title']}</span>
-                    <div class="doc-tags"></div>
-                </div>
-                <span class="doc-meta">
-                    <span class="doc-date">{date_str}</span>
-                    <button class="copy-btn" onclick="copyLink(event, '{full_url}')" title="リンクをコピー">
-                        <svg xmlns="http://www.w3.org/2000/svg" width="16" height="16" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><rect x="9" y="9" width="13" height="13" rx="2" ry="2"></rect><path d="M5 15H4a2 2 0 0 1-2-2V4a2 2 0 0 1 2-2h9a2 2 0 0 1 2 2v1"></path></svg>
-                    </button>
-                </span>
-            </a>
-        </li>
-'''
-    else:
-        docs_html = '        <li class="no-docs">ドキュメントはまだありません</li>\n'
-
-    # タグフィルターのHTML生成（localStorageから動的に生成するので空のコンテナのみ）
-    tags_filter_html = '''<div class="tag-filter">
-                    <span class="filter-label">タグで絞り込み:</span>
-                    <div class="tag-buttons" id="tag-filter-buttons">
-                        <button class="tag-btn active" data-tag="">すべて</button>
-                    </div>
-                </div>'''
-
-    # index.html生成
-    html_content = f'''<!DOCTYPE html>
+# index.htmlのテンプレート（ドキュメント一覧の前後で分割して順に書き出す）
+INDEX_HEAD = '''<!DOCTYPE html>
 <html lang="ja">
 <head>
     <meta charset="UTF-8">
@@ -222,7 +207,7 @@ def generate_index():
         <main>
             <section class="doc-list">
                 <div class="list-header">
-                    <h2>ドキュメント <span class="count" id="doc-count">({len(html_files)}件)</span></h2>
+                    <h2>ドキュメント <span class="count" id="doc-count">({count}件)</span></h2>
                     <div class="header-actions">
                         <button id="sort-toggle" class="sort-btn" onclick="toggleSort()" title="並び順を切り替え">
                             <span class="sort-label">新しい順</span>
@@ -239,375 +224,185 @@ def generate_index():
                         </button>
                     </div>
                 </div>
-                {tags_filter_html}
-                <ul id="doc-list">
-{docs_html}                </ul>
+'''
+
+# タグフィルター（localStorageから動的に生成するので空のコンテナのみ）
+INDEX_TAGS_FILTER = '''                <div class="tag-filter">
+                    <span class="filter-label">タグで絞り込み:</span>
+                    <div class="tag-buttons" id="tag-filter-buttons">
+                        <button class="tag-btn active" data-tag="">すべて</button>
+                    </div>
+                </div>
+'''
+
+INDEX_BODY_PRELUDE = '''                <ul id="doc-list">
+'''
+
+# ドキュメント1件分の<li>
+INDEX_DOC_ITEM = '''        <li class="doc-item" data-sort-key="{sort_key_str}" data-filename="{filename}" data-tags="{tags_attr}">
+            <a href="{path}" class="doc-link">
+                <div class="doc-info">
+                    <span class="doc-title">{title}</span>
+                    <div class="doc-tags"></div>
+                </div>
+                <span class="doc-meta">
+                    <span class="doc-date">{date_str}</span>
+                    <button class="copy-btn" onclick="copyLink(event, '{full_url}')" title="リンクをコピー">
+                        <svg xmlns="http://www.w3.org/2000/svg" width="16" height="16" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><rect x="9" y="9" width="13" height="13" rx="2" ry="2"></rect><path d="M5 15H4a2 2 0 0 1-2-2V4a2 2 0 0 1 2-2h9a2 2 0 0 1 2 2v1"></path></svg>
+                    </button>
+                </span>
+            </a>
+        </li>
+'''
+
+INDEX_NO_DOCS = '        <li class="no-docs">ドキュメントはまだありません</li>\n'
+
+INDEX_BODY_EPILOGUE = '''                </ul>
             </section>
         </main>
 
         <footer>
-            <p>最終更新: {datetime.now().strftime('%Y-%m-%d %H:%M')}</p>
+            <p>最終更新: {updated}</p>
         </footer>
     </div>
 
     <div id="toast" class="toast">リンクをコピーしました</div>
 
-    <script>
-    const STORAGE_KEY = 'metacreative_tags';
-    const TAG_USAGE_KEY = 'metacreative_tag_usage';
-    let isDescending = true;
-    let currentTag = '';
-    let tagsData = {{}};
-    let tagUsage = {{}};
-
-    // localStorageからタグデータを読み込み
-    function loadTagsFromStorage() {{
-        const stored = localStorage.getItem(STORAGE_KEY);
-        if (stored) {{
-            try {{
-                tagsData = JSON.parse(stored);
-            }} catch (e) {{
-                tagsData = {{}};
-            }}
-        }}
-        // タグ使用履歴を読み込み
-        const usageStored = localStorage.getItem(TAG_USAGE_KEY);
-        if (usageStored) {{
-            try {{
-                tagUsage = JSON.parse(usageStored);
-            }} catch (e) {{
-                tagUsage = {{}};
-            }}
-        }}
-    }}
-
-    // localStorageにタグデータを保存
-    function saveTagsToStorage() {{
-        localStorage.setItem(STORAGE_KEY, JSON.stringify(tagsData));
-    }}
-
-    // タグ使用履歴を保存
-    function saveTagUsage() {{
-        localStorage.setItem(TAG_USAGE_KEY, JSON.stringify(tagUsage));
-    }}
-
-    // タグの使用を記録
-    function recordTagUsage(tag) {{
-        tagUsage[tag] = Date.now();
-        saveTagUsage();
-    }}
-
-    // 全タグのリストを取得（最近使った順）
-    function getAllTags() {{
-        const allTags = new Set();
-        Object.values(tagsData).forEach(tags => {{
-            tags.forEach(tag => allTags.add(tag));
-        }});
-        // 最近使った順にソート（使用履歴がないものは最後）
-        return Array.from(allTags).sort((a, b) => {{
-            const usageA = tagUsage[a] || 0;
-            const usageB = tagUsage[b] || 0;
-            return usageB - usageA;
-        }});
-    }}
-
-    // タグフィルターボタンを再生成
-    function renderFilterButtons() {{
-        const container = document.getElementById('tag-filter-buttons');
-        const allTags = getAllTags();
-
-        container.innerHTML = '<button class="tag-btn active" data-tag="">すべて</button>';
-        allTags.forEach(tag => {{
-            const btn = document.createElement('button');
-            btn.className = 'tag-btn';
-            btn.dataset.tag = tag;
-            btn.textContent = tag;
-            container.appendChild(btn);
-        }});
-
-        // イベント再設定
-        container.querySelectorAll('.tag-btn').forEach(btn => {{
-            btn.addEventListener('click', function() {{
-                filterByTag(this.dataset.tag);
-                container.querySelectorAll('.tag-btn').forEach(b => b.classList.remove('active'));
-                this.classList.add('active');
-            }});
-        }});
-    }}
-
-    // ドキュメントのタグ表示を更新
-    function renderDocTags() {{
-        document.querySelectorAll('.doc-item').forEach(item => {{
-            const filename = item.dataset.filename;
-            const tags = tagsData[filename] || [];
-            const tagsContainer = item.querySelector('.doc-tags');
-
-            // data-tags属性も更新
-            item.dataset.tags = tags.join(' ');
-
-            // タグHTML生成
-            let html = '<button class="add-tag-btn" onclick="showTagInput(event, \\''+filename+'\\')">+</button>';
-            tags.forEach(tag => {{
-                html += `<span class="tag-with-delete" onclick="event.preventDefault(); event.stopPropagation();">
-                    ${{tag}}
-                    <button class="tag-delete-btn" onclick="removeTag(event, '${{filename}}', '${{tag}}')">&times;</button>
-                </span>`;
-            }});
-            tagsContainer.innerHTML = html;
-        }});
-    }}
-
-    // タグ入力を表示
-    function showTagInput(event, filename) {{
-        event.preventDefault();
-        event.stopPropagation();
-
-        // 既存の入力があれば削除
-        const existing = document.querySelector('.tag-input-container');
-        if (existing) existing.remove();
-
-        const btn = event.currentTarget;
-        const container = document.createElement('div');
-        container.className = 'tag-input-container';
-
-        const input = document.createElement('input');
-        input.type = 'text';
-        input.className = 'tag-input';
-        input.placeholder = 'タグを入力...';
-
-        const suggestions = document.createElement('div');
-        suggestions.className = 'tag-suggestions';
-        suggestions.style.display = 'none';
-
-        container.appendChild(input);
-        container.appendChild(suggestions);
-        btn.parentNode.insertBefore(container, btn.nextSibling);
-        input.focus();
-
-        // 入力時のサジェスト
-        input.addEventListener('input', function() {{
-            const val = this.value.trim().toLowerCase();
-            const allTags = getAllTags();
-            const currentTags = tagsData[filename] || [];
-
-            // 既についているタグは除外
-            const availableTags = allTags.filter(t => !currentTags.includes(t));
-
-            if (val) {{
-                const matches = availableTags.filter(t => t.toLowerCase().includes(val));
-                let html = '';
-                matches.forEach(t => {{
-                    html += `<div class="tag-suggestion-item" data-tag="${{t}}">${{t}}</div>`;
-                }});
-                // 新規タグとして追加オプション
-                if (!allTags.map(t => t.toLowerCase()).includes(val)) {{
-                    html += `<div class="tag-suggestion-item new-tag" data-tag="${{this.value.trim()}}">「${{this.value.trim()}}」を新規作成</div>`;
-                }}
-                suggestions.innerHTML = html;
-                suggestions.style.display = html ? 'block' : 'none';
-
-                // クリックイベント
-                suggestions.querySelectorAll('.tag-suggestion-item').forEach(item => {{
-                    item.addEventListener('click', function(e) {{
-                        e.preventDefault();
-                        e.stopPropagation();
-                        addTag(filename, this.dataset.tag);
-                        container.remove();
-                    }});
-                }});
-            }} else {{
-                // 空の場合は既存タグ一覧を表示
-                let html = '';
-                availableTags.slice(0, 5).forEach(t => {{
-                    html += `<div class="tag-suggestion-item" data-tag="${{t}}">${{t}}</div>`;
-                }});
-                suggestions.innerHTML = html;
-                suggestions.style.display = html ? 'block' : 'none';
-
-                suggestions.querySelectorAll('.tag-suggestion-item').forEach(item => {{
-                    item.addEventListener('click', function(e) {{
-                        e.preventDefault();
-                        e.stopPropagation();
-                        addTag(filename, this.dataset.tag);
-                        container.remove();
-                    }});
-                }});
-            }}
-        }});
-
-        // Enterキーで追加
-        input.addEventListener('keydown', function(e) {{
-            if (e.key === 'Enter' && this.value.trim()) {{
-                addTag(filename, this.value.trim());
-                container.remove();
-            }} else if (e.key === 'Escape') {{
-                container.remove();
-            }}
-        }});
-
-        // フォーカス外れたら閉じる（少し遅延させてクリックを受け付ける）
-        input.addEventListener('blur', function() {{
-            setTimeout(() => {{
-                if (!container.contains(document.activeElement)) {{
-                    container.remove();
-                }}
-            }}, 200);
-        }});
-
-        // 初期表示
-        input.dispatchEvent(new Event('input'));
-    }}
-
-    // タグを追加
-    function addTag(filename, tag) {{
-        if (!tagsData[filename]) {{
-            tagsData[filename] = [];
-        }}
-        if (!tagsData[filename].includes(tag)) {{
-            tagsData[filename].push(tag);
-            recordTagUsage(tag);
-            saveTagsToStorage();
-            renderDocTags();
-            renderFilterButtons();
-            showToast('タグを追加しました');
-        }}
-    }}
-
-    // タグを削除
-    function removeTag(event, filename, tag) {{
-        event.preventDefault();
-        event.stopPropagation();
-
-        if (tagsData[filename]) {{
-            tagsData[filename] = tagsData[filename].filter(t => t !== tag);
-            if (tagsData[filename].length === 0) {{
-                delete tagsData[filename];
-            }}
-            saveTagsToStorage();
-            renderDocTags();
-            renderFilterButtons();
-            // フィルターをリセット
-            if (currentTag === tag) {{
-                filterByTag('');
-            }}
-            showToast('タグを削除しました');
-        }}
-    }}
-
-    // タグデータをエクスポート
-    function exportTags() {{
-        const json = JSON.stringify(tagsData, null, 2);
-        const blob = new Blob([json], {{ type: 'application/json' }});
-        const url = URL.createObjectURL(blob);
-        const a = document.createElement('a');
-        a.href = url;
-        a.download = 'tags.json';
-        document.body.appendChild(a);
-        a.click();
-        document.body.removeChild(a);
-        URL.revokeObjectURL(url);
-        showToast('tags.jsonをダウンロードしました');
-    }}
-
-    // タグデータをインポート
-    function importTags(event) {{
-        const file = event.target.files[0];
-        if (!file) return;
-
-        const reader = new FileReader();
-        reader.onload = function(e) {{
-            try {{
-                const imported = JSON.parse(e.target.result);
-                if (typeof imported === 'object' && imported !== null) {{
-                    tagsData = imported;
-                    saveTagsToStorage();
-                    renderDocTags();
-                    renderFilterButtons();
-                    showToast('タグをインポートしました');
-                }} else {{
-                    showToast('無効なファイル形式です');
-                }}
-            }} catch (err) {{
-                showToast('JSONの読み込みに失敗しました');
-                console.error(err);
-            }}
-        }};
-        reader.readAsText(file);
-        event.target.value = '';
-    }}
-
-    function copyLink(event, url) {{
-        event.preventDefault();
-        event.stopPropagation();
-
-        navigator.clipboard.writeText(url).then(function() {{
-            showToast('リンクをコピーしました');
-        }}).catch(function(err) {{
-            console.error('コピーに失敗しました:', err);
-        }});
-    }}
-
-    function showToast(message) {{
-        const toast = document.getElementById('toast');
-        toast.textContent = message;
-        toast.classList.add('show');
-        setTimeout(function() {{
-            toast.classList.remove('show');
-        }}, 2000);
-    }}
-
-    function toggleSort() {{
-        isDescending = !isDescending;
-        const list = document.getElementById('doc-list');
-        const items = Array.from(list.querySelectorAll('.doc-item'));
-        const btn = document.getElementById('sort-toggle');
-        const label = btn.querySelector('.sort-label');
-        const svg = btn.querySelector('svg');
-
-        items.sort((a, b) => {{
-            const keyA = a.dataset.sortKey;
-            const keyB = b.dataset.sortKey;
-            return isDescending ? keyB.localeCompare(keyA) : keyA.localeCompare(keyB);
-        }});
-
-        items.forEach(item => list.appendChild(item));
-        label.textContent = isDescending ? '新しい順' : '古い順';
-        svg.style.transform = isDescending ? 'rotate(0deg)' : 'rotate(180deg)';
-    }}
-
-    function filterByTag(tag) {{
-        currentTag = tag;
-        const items = document.querySelectorAll('.doc-item');
-        let visibleCount = 0;
-
-        items.forEach(item => {{
-            const tags = item.dataset.tags || '';
-            if (!tag || tags.split(' ').includes(tag)) {{
-                item.style.display = '';
-                visibleCount++;
-            }} else {{
-                item.style.display = 'none';
-            }}
-        }});
-
-        document.getElementById('doc-count').textContent = `(${{visibleCount}}件)`;
-    }}
-
-    // 初期化
-    document.addEventListener('DOMContentLoaded', function() {{
-        loadTagsFromStorage();
-        renderDocTags();
-        renderFilterButtons();
-    }});
-    </script>
+    <script src="app.js"></script>
 </body>
 </html>
 '''
 
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+def render_doc_item(doc):
+    """ドキュメント1件分の<li>を生成"""
+    return INDEX_DOC_ITEM.format_map({
+        'sort_key_str': doc.sort_key_str,
+        'filename': escape(doc.filename),
+        'tags_attr': doc.tags_attr,
+        'path': escape(doc.path),
+        'title': escape(doc.title),
+        'date_str': doc.date_str,
+        'full_url': escape(doc.full_url)
+    })
+
+def generate_index(force=False):
+    """index.htmlを生成（入力に変更がなければ書き直さない）"""
+    # docs/の存在確認も兼ねて更新日時を取る（存在しなければ0）
+    docs_mtime_ns = get_mtime_ns(DOCS_DIR)
+
+    # 入力ファイルの中で最も新しい更新日時（docs/自体の日時でファイルの追加・削除も拾う）
+    latest_mtime_ns = max(docs_mtime_ns, *(get_mtime_ns(p) for p in (__file__, TAGS_FILE, IGNORE_FILE)))
+
+    # 除外リストを読み込む（読み取り専用のfrozenset）
+    ignore_list = load_ignore_list()
+
+    # タグ情報を読み込む
+    tags_data = load_tags()
+    all_tags = get_all_tags(tags_data)
+    # タグは多くのドキュメントで重複するので、エスケープはタグごとに一度だけ行う
+    escaped_tags = {tag: escape(tag) for tag in all_tags}
+
+    # 前回のタイトルキャッシュを読み込む
+    title_cache = load_title_cache()
+    new_title_cache = {}
+
+    # HTMLファイルを収集（日本語ファイル名は見つけ次第リネーム）
+    html_files = []
+    pending = []  # タイトル未取得のドキュメント（html_filesの添字, キャッシュキー）
+    renamed = set()
+    existing = None  # リネーム先の重複確認用のファイル名一覧
+    timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    if docs_mtime_ns:
+        with os.scandir(DOCS_DIR) as it:
+            for entry in it:
+                if not entry.name.endswith('.html') or entry.is_dir():
+                    continue
+                # リネーム後の名前が同じ走査で再度返ってきた場合は処理済み
+                if entry.name in renamed:
+                    continue
+                name = entry.name
+                # 除外リストに含まれるファイルはスキップ（stat等の前に判定）
+                if name in ignore_list:
+                    print(f"Skipped (in ignore list): {name}")
+                    continue
+                # URLにもそのまま使うので区切りは常に / にする（Windows対策）
+                path = f"{DOCS_DIR}/{name}"
+                st = entry.stat()
+                latest_mtime_ns = max(latest_mtime_ns, st.st_mtime_ns)
+                if not name.isascii():
+                    # リネームは稀なので、必要になった時だけファイル一覧を取る
+                    if existing is None:
+                        existing = set(os.listdir(DOCS_DIR))
+                    new_name = rename_japanese_file(name, timestamp, existing)
+                    if new_name:
+                        renamed.add(new_name)
+                        name = new_name
+                        path = f"{DOCS_DIR}/{name}"
+                        st = os.stat(path)
+                # 更新されていないファイルはキャッシュ済みのタイトルを使う
+                # （更新日時とサイズの両方が一致した場合のみ）
+                # （キャッシュにないものは後でまとめて並列に読む）
+                key = [st.st_mtime_ns, st.st_size]
+                cached = title_cache.get(name)
+                if cached and cached[:2] == key:
+                    title = cached[2]
+                    new_title_cache[name] = cached
+                else:
+                    title = None
+                    pending.append((len(html_files), key))
+                # ファイル名から日付を取得、なければ更新日時を使用
+                date_str, sort_key = parse_filename(name)
+                if not date_str:
+                    date_str = get_file_date(st)
+                # タグを取得
+                tags_attr = ' '.join(escaped_tags[tag] for tag in tags_data.get(name, ()))
+                html_files.append(DocEntry(
+                    path=path,
+                    filename=name,
+                    title=title,
+                    date_str=date_str,
+                    sort_key=sort_key,
+                    tags_attr=tags_attr,
+                    full_url=BASE_URL + path,
+                    sort_key_str=f"{sort_key[0]}_{sort_key[1]:02d}"
+                ))
+
+    # キャッシュにないタイトルはファイル読み込みを重ねて並列に取得
+    if pending:
+        max_workers = min(32, (os.cpu_count() or 4) * 4, len(pending))
+        with ThreadPoolExecutor(max_workers=max_workers) as ex:
+            titles = ex.map(get_html_title, [html_files[i].path for i, _ in pending])
+            for (i, key), title in zip(pending, titles):
+                html_files[i] = html_files[i]._replace(title=title)
+                new_title_cache[html_files[i].filename] = key + [title]
+
+    save_title_cache(new_title_cache)
+
+    # index.htmlが全ての入力より新しければ何もしない
+    # （タイトルを読み直したファイルがあれば、更新日時が古くても内容が変わっているので作り直す）
+    if not force and not renamed and not pending and get_mtime_ns(OUTPUT_FILE) > latest_mtime_ns:
+        print(f"{OUTPUT_FILE} is up to date ({len(html_files)} documents)")
+        return
+
+    # 日付の新しい順、同日は番号順にソート
+    html_files.sort(key=attrgetter('sort_key'), reverse=True)
+
+    # index.html生成（組み立てずにそのまま書き出す）
+    with open(OUTPUT_FILE, 'w', encoding='utf-8', buffering=65536) as f:
+        f.write(INDEX_HEAD.format(count=len(html_files)))
+        f.write(INDEX_TAGS_FILTER)
+        f.write(INDEX_BODY_PRELUDE)
+        # ドキュメントリストのHTML生成（1件ずつ生成してそのまま書き出す）
+        if html_files:
+            f.writelines(map(render_doc_item, html_files))
+        else:
+            f.write(INDEX_NO_DOCS)
+        f.write(INDEX_BODY_EPILOGUE.format(updated=datetime.now().strftime('%Y-%m-%d %H:%M')))
 
     print(f"Generated {OUTPUT_FILE} with {len(html_files)} documents")
 
 if __name__ == "__main__":
-    generate_index()
+    parser = argparse.ArgumentParser(description="docs/のHTMLからindex.htmlを生成します。")
+    parser.add_argument("--force", action="store_true", help="入力に変更がなくてもindex.htmlを書き直す")
+    args = parser.parse_args()
+    generate_index(force=args.force)
@@ -1,8 +1,11 @@
 import re
+import string
+import io
 from typing import List, Tuple
-from html import escape
+from functools import lru_cache
 import os
 import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from weasyprint import HTML
 
 # --- 設定とデザイン定義 ---
@@ -30,7 +33,10 @@ CHAPTER_EMOJIS_MAP = {
     "パーパス浸透ではなく": "💡",
 }
 
-CSS_STYLE = """
+# CSS はクラス名ごとのルールに分けておき、文書で実際に使われたクラスの分だけ出力する
+# (使われないルールを渡さないほど WeasyPrint のカスケード処理が軽くなる)
+CSS_RULES = {
+    'base': """
         * {
             margin: 0;
             padding: 0;
@@ -72,27 +78,33 @@ CSS_STYLE = """
             display: inline-block; background: linear-gradient(transparent 60%, #ffd97d 60%);
             padding: 0 0.3em; line-height: 1.5; box-decoration-break: clone; -webkit-box-decoration-break: clone;
         }
-        
+
         /* --- 地の文/段落 --- */
         p { margin-bottom: 1.2em; color: #3a3a3a; }
         hr { border: none; border-top: 1px solid #e0dbd3; margin: 2em 0; }
         strong { font-weight: 600; color: #2d2d2d; }
-
+""",
+    'dialogue': """
         /* --- 会話引用文のスタイル --- */
         .dialogue { border-left: 4px solid; padding: 1.2em 1.5em; margin: 1.5em 0; border-radius: 6px; font-size: 0.98em; }
-
+""",
+    'osato': """
         .dialogue.osato { background: linear-gradient(135deg, #fdf6e9 0%, #f7ebd4 100%); border-left-color: #d4a574; }
         .dialogue.osato .dialogue-speaker { color: #a87c3f; }
-
+""",
+    'tamkai': """
         .dialogue.tamkai { background: linear-gradient(135deg, #f0f4f7 0%, #e3ebf0 100%); border-left-color: #7b9aad; }
         .dialogue.tamkai .dialogue-speaker { color: #5a7485; }
-
+""",
+    'opi': """
         .dialogue.opi { background: linear-gradient(135deg, #f2f7f0 0%, #e5f0e3 100%); border-left-color: #8ba882; }
         .dialogue.opi .dialogue-speaker { color: #5d7a57; }
-
+""",
+    'dialogue-speaker': """
         .dialogue-speaker { font-weight: 600; margin-bottom: 0.3em; line-height: 1.2; }
         .dialogue-text { color: #3a3a3a; line-height: 1.7; margin-bottom: 0; }
-
+""",
+    'annotation': """
         /* --- 注釈のスタイル --- */
         .annotation { background-color: #faf9f7; border: 1px solid #e5e1db; border-radius: 8px; padding: 1.5em; margin: 2em 0; font-size: 0.92em; }
         .annotation-title { font-weight: 700; color: #5a5a5a; margin-bottom: 0.8em; font-size: 1.05em; display: flex; align-items: center; }
@@ -100,7 +112,8 @@ CSS_STYLE = """
         .annotation-content { color: #4a4a4a; line-height: 1.7; }
         .annotation-content p { margin-bottom: 0.8em; }
         .annotation-content p:last-child { margin-bottom: 0; }
-        
+""",
+    'table-of-contents': """
         /* --- 目次のスタイル --- */
         .table-of-contents { background-color: #faf9f7; border: 1px solid #e5e1db; border-radius: 8px; padding: 2em; margin: 2.5em 0; }
         .table-of-contents h2 { font-size: 1.4em; margin-top: 0; margin-bottom: 1em; border-bottom: none; }
@@ -109,20 +122,23 @@ CSS_STYLE = """
         .table-of-contents li::before { content: "第" counter(chapter) "章"; font-weight: 600; color: #8b6f47; margin-right: 1em; }
         .table-of-contents a { color: #3a3a3a; text-decoration: none; transition: color 0.2s; }
         .table-of-contents a:hover { color: #8b6f47; }
-
+""",
+    'chapter-image': """
         /* --- 章の画像 (絵文字) --- */
         .chapter-image {
             width: 150px; height: 150px; margin: 1.5em auto; display: block; border-radius: 8px;
             background: linear-gradient(135deg, #d4cfc7 0%, #e8e3db 100%); 
             display: flex; align-items: center; justify-content: center; font-size: 3em; color: #2d2d2d;
         }
-
+""",
+    'title-page': """
         /* --- タイトルページ装飾 --- */
         .title-page { padding: 8em 2em 6em 2em; text-align: center; }
         .title-ornament { font-size: 3em; margin: 0.5em 0; color: #d4a574; }
         .title-page h1 { border-bottom: 3px solid #d4cfc7; padding-bottom: 0.5em; display: inline-block; }
         .subtitle { font-size: 1.1em; color: #6b6b6b; margin-top: 1em; font-weight: 500; }
-        
+""",
+    'print': """
         /* --- PDF専用スタイル (@media print) --- */
         @media print {
             body, .container { background-color: white; box-shadow: none; }
@@ -132,7 +148,14 @@ CSS_STYLE = """
             #introduction { page-break-before: auto; }
             .annotation, .dialogue { page-break-inside: avoid; }
         }
-"""
+""",
+}
+
+# 文書の内容に関わらず常に出力するルール
+_CSS_ALWAYS = frozenset(('base', 'title-page', 'print'))
+
+# 全ルールを含む CSS (参照用)
+CSS_STYLE = ''.join(CSS_RULES.values())
 
 HTML_TEMPLATE = """
 <!DOCTYPE html>
@@ -166,8 +189,94 @@ HTML_TEMPLATE = """
 </html>
 """
 
+# テンプレートは本文 ({content_html}) の前後で分割しておく
+# (変換のたびにテンプレート全体を format し直さないため)
+def _split_html_template():
+    head, tail = HTML_TEMPLATE.split('{content_html}')
+    for name in ('css_style', 'title', 'main_title', 'sub_title', 'metadata'):
+        head = head.replace('{%s}' % name, '${%s}' % name)
+    return string.Template(head), tail
+
+_HTML_HEAD, _HTML_TAIL = _split_html_template()
+
+# WeasyPrint の画像キャッシュ (write_pdf の cache オプション。複数ファイルを続けて変換するときに使い回す)
+_IMG_CACHE = {}
+
+def build_css(used_classes: set) -> str:
+    """使われたクラスに対応するルールと基本ルールだけで CSS を組み立てる"""
+    return ''.join(rule for key, rule in CSS_RULES.items()
+                   if key in _CSS_ALWAYS or key in used_classes)
+
 # --- マークダウンパースロジック ---
 
+# 正規表現は行ごとに使うので、モジュール読み込み時に一度だけコンパイルしておく
+_RE_BLANK_LINES = re.compile(r'\n\s*\n')
+_RE_ANN_START = re.compile(r'^\*\*【.+?】\*\*')
+_RE_ANN_TITLE = re.compile(r'\*\*【(.+?)】\*\*')
+_RE_BOLD = re.compile(r'\*\*(.+?)\*\*')
+_RE_ITALIC = re.compile(r'\*(.+?)\*')
+_RE_LIST = re.compile(r'^[*-]\s')
+_RE_OLIST = re.compile(r'^\d+\.\s')
+_RE_CHAPTER_PREFIX = re.compile(r'第\d+章:\s*')
+
+# 行の種類を1回のマッチで判定する (見出し / 会話引用文 / 出力しない行)
+# どれにも当たらない空でない行は通常の段落として扱う
+_RE_LINE_KIND = re.compile(
+    r'(?P<H2>## )'
+    r'|(?P<H3>### )'
+    r'|(?P<DLG>>\s\*\*(.+?)\*\*：「(.+?)」)'
+    r'|(?P<SKIP>[#>])'
+)
+
+# HTML エスケープ用の変換表 (html.escape と同じ置換を str.translate の1パスで行う)
+_HTML_ESCAPE_TBL = str.maketrans({
+    '&': '&amp;',
+    '<': '&lt;',
+    '>': '&gt;',
+    '"': '&quot;',
+    "'": '&#x27;',
+})
+
+def _esc(s: str) -> str:
+    """テキストを HTML 用にエスケープする"""
+    return s.translate(_HTML_ESCAPE_TBL)
+
+# 出力する要素のテンプレート (行ごとに f-string を組み立てず、% で埋めるだけにする)
+_H2_INTRO_TPL = '<h2 id="introduction">%s</h2>'
+_H2_CHAPTER_TPL = '<h2 id="chapter%d">第%d章:%s</h2>'
+_CHAPTER_IMG_TPL = '<div class="chapter-image">%s</div>'
+_H3_TPL = '<h3>%s</h3>'
+_P_TPL = '<p>%s</p>'
+_LI_TPL = '<li>%s</li>'
+# 目次 (項目は1行ずつ)
+_TOC_HEAD = """
+        <div class="table-of-contents">
+            <h2>目次</h2>
+            <ol>
+    """
+_TOC_ITEM_TPL = '<li><a href="#chapter%d">%s</a></li>\n'
+_TOC_TAIL = """
+            </ol>
+        </div>
+    """
+_DIALOGUE_TPL = (
+    '<div class="dialogue %s">\n'
+    '    <div class="dialogue-speaker">%s</div>\n'
+    '    <p class="dialogue-text">「%s」</p>\n'
+    '</div>'
+)
+_ANNOTATION_TPL = (
+    '<div class="annotation">\n'
+    '    <div class="annotation-title">%s</div>\n'
+    '    <div class="annotation-content">\n'
+    '        %s\n'
+    '    </div>\n'
+    '</div>'
+)
+
+# 判定は辞書の順にキーを調べる (話者名に複数のキーが含まれる場合は先に書いたものを優先)
+# 同じ名前が何度も出てくるので結果は lru_cache で使い回す
+@lru_cache(maxsize=256)
 def get_speaker_class(speaker: str) -> str:
     """話者名から対応するCSSクラスを取得する"""
     for key, class_name in SPEAKER_MAP.items():
@@ -175,6 +284,7 @@ def get_speaker_class(speaker: str) -> str:
             return class_name
     return "tamkai" # デフォルト
 
+@lru_cache(maxsize=256)
 def get_chapter_emoji(title: str) -> str:
     """章のタイトルから対応する絵文字を取得する"""
     for key, emoji in CHAPTER_EMOJIS_MAP.items():
@@ -182,20 +292,170 @@ def get_chapter_emoji(title: str) -> str:
             return emoji
     return ""
 
+class _HtmlBuilder:
+    """パース中の出力・目次・章番号をまとめて保持する"""
+
+    def __init__(self):
+        self.buf = io.StringIO()
+        self._sep = ''  # 要素同士の区切り (最初の要素の前には入れない)
+        self.toc_entries: List[Tuple[int, str, str]] = []
+        self.chapter_count = 0
+        self.used_classes = set()  # 出力した要素のクラス (CSS の絞り込みに使う)
+        self.in_list = False       # <ul> を開いたままリスト項目を出力中か
+        # 直前の話者とそのクラス (同じ話者の発言が続くことが多いので判定を省く)
+        self.last_speaker = None
+        self.last_speaker_class = None
+        # 目次の挿入位置 (出力しながら記録し、後から文字列を検索しない)
+        self.has_intro = False
+        self.intro_end_pos = None  # 「はじめに」以降で最初に </p> を含む要素 (ブロック全体) の末尾の位置
+        self.toc_pos = None        # その後の最初の <hr> の位置
+
+    def append(self, html: str) -> None:
+        """要素を1つ出力する (要素同士は改行で区切る)"""
+        self.buf.write(self._sep)
+        self.buf.write(html)
+        self._sep = '\n'
+
+    def mark_paragraph(self) -> None:
+        """</p> を含む要素を追加した直後に呼び、目次の挿入位置を記録する"""
+        # 会話引用文や注釈は閉じタグまで追加してから呼ぶ (目次がブロックの中に入らないように)
+        if self.has_intro and self.intro_end_pos is None:
+            self.intro_end_pos = self.buf.tell()
+
+    def append_list_item(self, item: str) -> None:
+        """リスト項目を追加する (連続する項目は1つの <ul> にまとめる)"""
+        if self.in_list:
+            self.append(_LI_TPL % item)
+        else:
+            self.append('<ul>' + _LI_TPL % item)
+            self.in_list = True
+
+    def close_list(self) -> None:
+        """開いているリストがあれば閉じる (リスト以外の要素を追加する前に呼ぶ)"""
+        if self.in_list:
+            self.buf.write('</ul>')
+            self.in_list = False
+
+    def append_hr(self) -> None:
+        """水平線を追加する (「はじめに」の段落の後の最初のものを目次の位置として記録)"""
+        if self.intro_end_pos is not None and self.toc_pos is None:
+            self.toc_pos = self.buf.tell() + len(self._sep)
+        self.append("<hr>")
+
+def _emit_h2(out: _HtmlBuilder, m: re.Match, stripped_line: str) -> None:
+    """## 見出し (「はじめに」または章) を出力する"""
+    title = stripped_line[m.end():].strip()
+    anchor = title.replace(' ', '-').replace('：', '').replace('—', '').replace('——', '') # 簡易アンカー
+
+    if 'はじめに' in title and out.chapter_count == 0:
+        out.append(_H2_INTRO_TPL % _esc(title))
+        out.has_intro = True
+    else:
+        out.chapter_count += 1
+        chapter_count = out.chapter_count
+        out.toc_entries.append((chapter_count, title, anchor))
+
+        # HTML出力
+        out.append(_H2_CHAPTER_TPL % (chapter_count, chapter_count, _esc(title)))
+        emoji = get_chapter_emoji(title)
+        if emoji:
+            out.append(_CHAPTER_IMG_TPL % emoji)
+            out.used_classes.add('chapter-image')
+
+def _emit_h3(out: _HtmlBuilder, m: re.Match, stripped_line: str) -> None:
+    """### 見出しを出力する"""
+    title = stripped_line[m.end():].strip()
+    out.append(_H3_TPL % _esc(title))
+
+def _emit_dialogue(out: _HtmlBuilder, m: re.Match, stripped_line: str) -> None:
+    """会話引用文 (> **話者**：「発言」) を出力する"""
+    speaker = m.group(4).strip()
+    text = m.group(5).strip()
+    if speaker == out.last_speaker:
+        speaker_class = out.last_speaker_class
+    else:
+        speaker_class = get_speaker_class(speaker)
+        out.last_speaker = speaker
+        out.last_speaker_class = speaker_class
+
+    out.append(_DIALOGUE_TPL % (speaker_class, _esc(speaker), _esc(text)))
+    out.mark_paragraph()
+    out.used_classes.update(('dialogue', 'dialogue-speaker', speaker_class))
+
+def _emphasize(text: str) -> str:
+    """強調 (*や**で囲まれた部分) を<strong>タグに変換する (簡易)"""
+    # ** を行全体で先に処理してから * を処理する (1回の走査にまとめると *** や斜体の中の太字が崩れる)
+    text = _RE_BOLD.sub(r'<strong>\1</strong>', text)
+    return _RE_ITALIC.sub(r'<strong>\1</strong>', text)
+
+def _emit_paragraph(out: _HtmlBuilder, stripped_line: str) -> None:
+    """通常の段落・リストを出力する"""
+    text = _emphasize(stripped_line)
+
+    if _RE_LIST.match(text): # リストアイテム
+        out.append_list_item(text[2:].strip())
+        return
+
+    out.close_list()
+    if _RE_OLIST.match(text): # 番号付きリストアイテム
+        # ここではリストの開始/終了タグの制御が困難なため、簡易的な <p> として処理
+        out.append(_P_TPL % text)
+        out.mark_paragraph()
+    else:
+        out.append(_P_TPL % text)
+        out.mark_paragraph()
+
+def _emit_annotation(out: _HtmlBuilder, lines: List[str]) -> None:
+    """注釈ブロック (**【タイトル】** の行から --- の手前まで) を出力する"""
+    # 行を1度だけ走査し、1行目からタイトルを取り出して、残りを空行ごとに段落にする
+    # (空白だけの行は読み込み時に空行へ正規化済み)
+    title = "注釈"
+    paragraphs = []
+    paragraph_buf = []
+    for i, line in enumerate(lines):
+        if i == 0:
+            title_match = _RE_ANN_TITLE.search(line)
+            if title_match:
+                title = title_match.group(1).strip()
+                line = line[title_match.end():]
+            paragraph_buf.append(line)
+        elif line:
+            paragraph_buf.append(line)
+        else:
+            paragraph = "\n".join(paragraph_buf).strip()
+            if paragraph:
+                paragraphs.append(_P_TPL % _esc(paragraph))
+            paragraph_buf = []
+    paragraph = "\n".join(paragraph_buf).strip()
+    if paragraph:
+        paragraphs.append(_P_TPL % _esc(paragraph))
+
+    out.append(_ANNOTATION_TPL % (_esc(title), "".join(paragraphs)))
+    if paragraphs:
+        out.mark_paragraph()
+    out.used_classes.add('annotation')
+
+# 行の種類ごとの出力関数 (SKIP は何も出力しない)
+_LINE_EMITTERS = {
+    'H2': _emit_h2,
+    'H3': _emit_h3,
+    'DLG': _emit_dialogue,
+    'SKIP': None,
+}
+
 def markdown_to_html_custom(md_content: str, metadata: dict) -> str:
     """カスタムマークダウンをHTMLに変換し、目次を生成する"""
     
     # メタデータ抽出 (最初の # から --- の間)
     
     # 連続する複数の空白行を単一の空白行に置換
-    md_content = re.sub(r'\n\s*\n', '\n\n', md_content)
+    md_content = _RE_BLANK_LINES.sub('\n\n', md_content)
     
     lines = md_content.split('\n')
     
-    html_lines = []
-    toc_entries = []
+    out = _HtmlBuilder()
+    toc_entries = out.toc_entries
     
-    chapter_count = 0
     in_annotation = False
     annotation_content = []
 
@@ -206,177 +466,147 @@ def markdown_to_html_custom(md_content: str, metadata: dict) -> str:
         if stripped_line == "---":
             # 注釈終了
             if in_annotation:
-                content_text = "\n".join(annotation_content)
-                
-                # 注釈タイトルを抽出
-                title_match = re.search(r'\*\*【(.+?)】\*\*', content_text, re.DOTALL)
-                title = title_match.group(1).strip() if title_match else "注釈"
-                
-                # 注釈内容を抽出 (タイトル行以降)
-                content_body = re.sub(r'\*\*【.+?】\*\*\n*', '', content_text, 1).strip()
-                content_paragraphs = "".join([f"<p>{escape(p.strip())}</p>" for p in content_body.split('\n\n') if p.strip()])
-                
-                html_lines.append(f"""
-<div class="annotation">
-    <div class="annotation-title">{escape(title)}</div>
-    <div class="annotation-content">
-        {content_paragraphs}
-    </div>
-</div>
-                """.strip())
+                out.close_list()
+                _emit_annotation(out, annotation_content)
                 in_annotation = False
                 annotation_content = []
                 continue
             
             # 注釈開始 (次の行が **【タイトル】** の場合)
-            if i + 1 < len(lines) and re.match(r'^\*\*【.+?】\*\*', lines[i+1].strip()):
+            if i + 1 < len(lines) and _RE_ANN_START.match(lines[i+1].strip()):
                 in_annotation = True
                 continue
             
             # 通常の水平線
             if not in_annotation:
-                html_lines.append("<hr>")
+                out.close_list()
+                out.append_hr()
                 continue
         
         if in_annotation:
             annotation_content.append(line)
             continue
             
-        # 2. 見出しの処理
-        if stripped_line.startswith('## '):
-            title = stripped_line[3:].strip()
-            anchor = title.replace(' ', '-').replace('：', '').replace('—', '').replace('——', '') # 簡易アンカー
-            
-            if 'はじめに' in title and chapter_count == 0:
-                anchor = "introduction"
-                html_lines.append(f'<h2 id="{anchor}">{escape(title)}</h2>')
-            else:
-                chapter_count += 1
-                toc_entries.append((chapter_count, title, anchor))
-                
-                # HTML出力
-                html_lines.append(f'<h2 id="chapter{chapter_count}">第{chapter_count}章:{escape(title)}</h2>')
-                emoji = get_chapter_emoji(title)
-                if emoji:
-                    html_lines.append(f'<div class="chapter-image">{emoji}</div>')
-
-        elif stripped_line.startswith('### '):
-            title = stripped_line[4:].strip()
-            html_lines.append(f'<h3>{escape(title)}</h3>')
-
-        # 3. 会話引用文の処理
-        elif re.match(r'^>\s\*\*(.+?)\*\*：「(.+?)」', stripped_line):
-            dialogue_match = re.match(r'^>\s\*\*(.+?)\*\*：「(.+?)」', stripped_line)
-            speaker = dialogue_match.group(1).strip()
-            text = dialogue_match.group(2).strip()
-            speaker_class = get_speaker_class(speaker)
-            
-            html_lines.append(f"""
-<div class="dialogue {speaker_class}">
-    <div class="dialogue-speaker">{escape(speaker)}</div>
-    <p class="dialogue-text">「{escape(text)}」</p>
-</div>
-            """.strip())
-
-        # 4. 通常の段落・リストの処理
-        elif stripped_line and not stripped_line.startswith('#') and not stripped_line.startswith('>'):
-            # 強調 (*や**で囲まれた部分) を<strong>タグに変換 (簡易)
-            text = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', stripped_line)
-            text = re.sub(r'\*(.+?)\*', r'<strong>\1</strong>', text)
-            
-            if re.match(r'^[*-]\s', text): # リストアイテム
-                html_lines.append(f"<ul><li>{text[2:].strip()}</li></ul>")
-            elif re.match(r'^\d+\.\s', text): # 番号付きリストアイテム
-                # ここではリストの開始/終了タグの制御が困難なため、簡易的な <p> として処理
-                 html_lines.append(f"<p>{text}</p>")
-            else:
-                 html_lines.append(f"<p>{text}</p>")
+        # 2. 見出し・会話引用文・段落の処理 (行の種類を1回で判定して振り分け)
+        m = _RE_LINE_KIND.match(stripped_line)
+        if m is None:
+            if stripped_line:
+                _emit_paragraph(out, stripped_line)
+        else:
+            emit = _LINE_EMITTERS[m.lastgroup]
+            if emit:
+                out.close_list()
+                emit(out, m, stripped_line)
+    out.close_list()
     
-    # 5. リストの修正 (簡易: 連続する <ul>/</ul> を削除)
-    content_html = "\n".join(html_lines)
-    content_html = re.sub(r'</ul>\s*<ul>', '', content_html)
-
-
-    # 6. 目次HTMLの生成と挿入
-    toc_html = """
-        <div class="table-of-contents">
-            <h2>目次</h2>
-            <ol>
-    """
-    for count, title, anchor in toc_entries:
-        display_title = re.sub(r'第\d+章:\s*', '', title)
-        toc_html += f'<li><a href="#chapter{count}">{escape(display_title)}</a></li>\n'
-    toc_html += """
-            </ol>
-        </div>
-    """
+    # 3. 目次HTMLの生成と挿入
+    toc_items = [_TOC_ITEM_TPL % (count, _esc(_RE_CHAPTER_PREFIX.sub('', title)))
+                 for count, title, _anchor in toc_entries]
+    toc_html = _TOC_HEAD + "".join(toc_items) + _TOC_TAIL
     
-    # 「はじめに」セクションの後に目次を挿入
-    intro_end_index = content_html.find('</p>', content_html.find('id="introduction"'))
-    if intro_end_index != -1:
-        # 最初の hr の位置を探す (導入と目次の区切りとして)
-        hr_index = content_html.find('<hr>', intro_end_index)
-        
-        if hr_index != -1:
-             final_content_html = content_html[:hr_index] + "<hr>\n" + toc_html + content_html[hr_index:]
-        else:
-             final_content_html = content_html[:intro_end_index + 4] + "\n\n<hr>\n" + toc_html + content_html[intro_end_index + 4:]
-    else:
-        final_content_html = content_html
-
-
-    return HTML_TEMPLATE.format(
+    # 「はじめに」セクションの後に目次を挿入 (位置は出力時に記録済み)
+    final_content_html = out.buf.getvalue()
+    out.buf.close()
+    if out.toc_pos is not None:
+        # 最初の hr の手前 (導入と目次の区切りとして)
+        pos = out.toc_pos
+        final_content_html = final_content_html[:pos] + "<hr>\n" + toc_html + final_content_html[pos:]
+        out.used_classes.add('table-of-contents')
+    elif out.intro_end_pos is not None:
+        # hr がなければ段落の直後
+        pos = out.intro_end_pos
+        final_content_html = final_content_html[:pos] + "\n\n<hr>\n" + toc_html + final_content_html[pos:]
+        out.used_classes.add('table-of-contents')
+
+    return _HTML_HEAD.substitute(
+        css_style=build_css(out.used_classes),
         title=metadata['title'],
-        css_style=CSS_STYLE,
         main_title=metadata['main_title'],
         sub_title=metadata['sub_title'],
         metadata=metadata['metadata'],
-        content_html=final_content_html
-    )
+    ) + final_content_html + _HTML_TAIL
 
 # --- メイン実行関数 ---
 
-def main():
-    parser = argparse.ArgumentParser(description="メタクリドキュメントをHTML/PDFに変換します。")
-    parser.add_argument("input_file", help="入力マークダウンファイル (.md)")
-    parser.add_argument("--output_html", default="output.html", help="出力HTMLファイル名")
-    parser.add_argument("--output_pdf", default="output.pdf", help="出力PDFファイル名 (weasyprintが必要)")
-    args = parser.parse_args()
+# メタデータ (必要に応じて外部から取得するか、MDファイルからパース)
+# ここでは、フジトラレポートのメタデータをハードコード (実際の利用時はMDからパース推奨)
+METADATA = {
+    'title': '現場からカルチャー変革は起こせるのか - フジトラの実践者が語る',
+    'main_title': '現場からカルチャー変革は起こせるのか',
+    'sub_title': '富士通「フジトラ」の実践者が語る、自分ごと化の本質',
+    'metadata': '日付：2025年11月26日<br>登壇者：タムラカイ（株式会社AFFLATUS代表取締役）<br>主催：株式会社セルム パーパス経営・理念経営勉強会'
+}
 
-    # メタデータ (必要に応じて外部から取得するか、MDファイルからパース)
-    # ここでは、フジトラレポートのメタデータをハードコード (実際の利用時はMDからパース推奨)
-    metadata = {
-        'title': '現場からカルチャー変革は起こせるのか - フジトラの実践者が語る',
-        'main_title': '現場からカルチャー変革は起こせるのか',
-        'sub_title': '富士通「フジトラ」の実践者が語る、自分ごと化の本質',
-        'metadata': '日付：2025年11月26日<br>登壇者：タムラカイ（株式会社AFFLATUS代表取締役）<br>主催：株式会社セルム パーパス経営・理念経営勉強会'
-    }
+def _write_text(path: str, text: str) -> None:
+    """文字列をUTF-8でファイルに書き出す"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
 
+def _convert_one(path: str, out_html: str, out_pdf: str) -> None:
+    """マークダウンファイル1つをHTML/PDFに変換する"""
     try:
-        with open(args.input_file, 'r', encoding='utf-8') as f:
+        with open(path, 'r', encoding='utf-8') as f:
             md_content = f.read()
 
-        full_html = markdown_to_html_custom(md_content, metadata)
+        full_html = markdown_to_html_custom(md_content, METADATA)
 
-        # 1. HTMLファイルを保存
-        with open(args.output_html, 'w', encoding='utf-8') as f:
-            f.write(full_html)
-        print(f"✅ HTMLファイルが {args.output_html} に保存されました。")
+        # 1. HTMLファイルの保存はバックグラウンドで行い、その間にPDFを生成する
+        # (書き込み待ちの間もCPUを遊ばせないため)
+        # PDFは保存中のファイルではなく文字列から作るので、生成中もHTML文字列はメモリに残る
+        with ThreadPoolExecutor(max_workers=1) as io_pool:
+            html_saved = io_pool.submit(_write_text, out_html, full_html)
 
-        # 2. PDFファイルを生成
-        try:
-            # WeasyPrint を使用
-            HTML(string=full_html).write_pdf(args.output_pdf)
-            print(f"✅ PDFファイルが {args.output_pdf} に保存されました。")
-        except Exception as e:
-            print(f"⚠️ WeasyPrintでのPDF生成に失敗しました (WeasyPrintがインストールされていないか、他のエラー): {e}")
+            # 2. PDFファイルを生成
+            pdf_error = None
+            try:
+                # WeasyPrint を使用 (デコード済みの文字列を渡すので文字コードの自動判定は行われない)
+                HTML(string=full_html).write_pdf(
+                    out_pdf, cache=_IMG_CACHE, optimize_images=True)
+            except Exception as e:
+                pdf_error = e
+
+            html_saved.result()
+        print(f"✅ HTMLファイルが {out_html} に保存されました。")
+
+        if pdf_error is None:
+            print(f"✅ PDFファイルが {out_pdf} に保存されました。")
+        else:
+            print(f"⚠️ WeasyPrintでのPDF生成に失敗しました (WeasyPrintがインストールされていないか、他のエラー): {pdf_error}")
             print("HTMLファイルのみが生成されています。")
 
     except FileNotFoundError:
-        print(f"❌ エラー: 入力ファイル {args.input_file} が見つかりません。")
+        print(f"❌ エラー: 入力ファイル {path} が見つかりません。")
     except Exception as e:
         print(f"❌ 予期せぬエラーが発生しました: {e}")
 
+def main_batch(md_paths: List[str]) -> None:
+    """複数のマークダウンファイルを並列に変換する (出力は各入力ファイルと同じ場所に .html / .pdf)"""
+    # WeasyPrint は1文書の中では並列化できないので、文書ごとに別プロセスへ振り分ける
+    stems = [os.path.splitext(p)[0] for p in md_paths]
+    html_paths = [stem + '.html' for stem in stems]
+    pdf_paths = [stem + '.pdf' for stem in stems]
+    with ProcessPoolExecutor() as ex:
+        list(ex.map(_convert_one, md_paths, html_paths, pdf_paths))
+
+def main():
+    parser = argparse.ArgumentParser(description="メタクリドキュメントをHTML/PDFに変換します。")
+    parser.add_argument("input_file", nargs="?", help="入力マークダウンファイル (.md)")
+    parser.add_argument("--output_html", default="output.html", help="出力HTMLファイル名")
+    parser.add_argument("--output_pdf", default="output.pdf", help="出力PDFファイル名 (weasyprintが必要)")
+    parser.add_argument("--batch-dir", help="このディレクトリ内の .md をすべて並列に変換する")
+    args = parser.parse_args()
+
+    if args.batch_dir:
+        md_paths = sorted(e.path for e in os.scandir(args.batch_dir)
+                          if e.is_file() and e.name.endswith('.md'))
+        main_batch(md_paths)
+        return
+
+    if not args.input_file:
+        parser.error("入力ファイルか --batch-dir を指定してください。")
+
+    _convert_one(args.input_file, args.output_html, args.output_pdf)
+
 if __name__ == '__main__':
     # 実行例: python metacure_document_converter.py 20251126_report.md
     # main() # 知識登録時はコメントアウト
\ No newline at end of file